@@ -1,5 +1,5 @@
 """Utility functions for the claude-continuity-kit."""
 
-from .retry import retry
+from .retry import CircuitOpenError, RetryAbortedError, current_attempt, retry, retry_attempt_var
 
-__all__ = ["retry"]
+__all__ = ["CircuitOpenError", "RetryAbortedError", "current_attempt", "retry", "retry_attempt_var"]
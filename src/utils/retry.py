@@ -2,37 +2,306 @@
 Retry decorator for handling transient failures.
 
 This module provides a decorator that automatically retries a function
-when it raises an exception, with configurable attempts and delay.
+when it raises an exception, with configurable attempts and exponential
+backoff with jitter between attempts.
 """
 
 import asyncio
-import functools
+import inspect
+import itertools
 import logging
+import random
+import threading
 import time
-from typing import TypeVar, ParamSpec, Callable, Awaitable
+from contextvars import ContextVar
+from typing import Any, TypeVar, ParamSpec, Callable, Awaitable, Hashable, Literal
 
 logger = logging.getLogger(__name__)
 
+# Attempt number of the retried call running in the current context, so that
+# logging or tracing middleware can tag it without changing any signature.
+# 0 means "not inside a retried call".
+retry_attempt_var: ContextVar[int] = ContextVar("retry_attempt", default=0)
+
 P = ParamSpec("P")
 R = TypeVar("R")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def current_attempt() -> int:
+    """Return the attempt number (1-based) of the enclosing retried call.
+
+    Returns 0 when called outside a function decorated with ``retry``.
+    """
+    return retry_attempt_var.get()
+
+
+_WRAPPED_ATTRIBUTES = ("__module__", "__name__", "__qualname__", "__doc__")
+
+
+def _wraps(func: Callable[..., Any]) -> Callable[[F], F]:
+    """Copy the identifying metadata of ``func`` onto a wrapper.
+
+    A lean stand-in for ``functools.wraps``: it sets only what callers and
+    ``inspect`` rely on and skips copying ``__dict__``, which keeps decorating
+    many functions at import time cheap.
+    """
+
+    def apply(wrapper: F) -> F:
+        # Like functools.wraps, attributes the callable lacks (a partial or a
+        # callable instance has no __name__) are left as the wrapper's own.
+        for attr in _WRAPPED_ATTRIBUTES:
+            try:
+                value = getattr(func, attr)
+            except AttributeError:
+                continue
+            setattr(wrapper, attr, value)
+        wrapper.__wrapped__ = func  # type: ignore[attr-defined]
+        return wrapper
+
+    return apply
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a function whose circuit breaker is open.
+
+    The breaker opens after ``circuit_threshold`` consecutive calls exhausted
+    their retries, and stays open for ``circuit_reset_timeout`` seconds.
+    """
+
+    pass
+
+
+class RetryAbortedError(Exception):
+    """Raised when ``stop_event`` is set while waiting between retries.
+
+    The exception from the attempt that was about to be retried is chained
+    as ``__cause__``.
+    """
+
+    pass
+
+
+# How often a threading.Event is re-checked while a coroutine waits on it.
+_STOP_POLL_INTERVAL = 0.05
+
+
+async def _async_wait_or_stop(stop_event: threading.Event | asyncio.Event, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds without blocking the event loop.
+
+    Returns True if ``stop_event`` got set before the timeout ran out.
+    """
+    if stop_event.is_set():
+        return True
+    if timeout <= 0:
+        return False
+    if isinstance(stop_event, threading.Event):
+        # Polled in short slices rather than waited on in a worker thread: a
+        # thread per waiter would queue retry storms on the default executor
+        # and keep sleeping after the task is cancelled.
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(_STOP_POLL_INTERVAL, remaining))
+            if stop_event.is_set():
+                return True
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout)
+    except TimeoutError:
+        return False
+    return True
+
+
+class _CircuitBreaker:
+    """Closed/open/half-open state shared by every call to one decorated function.
+
+    Once ``reset_timeout`` has passed, exactly one trial call is let through in
+    half_open; everyone else keeps getting ``CircuitOpenError`` until the trial
+    succeeds (closed), fails (open again) or ends without saying anything
+    about the dependency (open, so that the next call becomes the trial).
+
+    State changes are guarded by a ``threading.Lock``. None of them await, so
+    the same lock is safe to take from coroutines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int,
+        reset_timeout: float,
+        retry_on: tuple[type[BaseException], ...],
+        give_up_on: tuple[type[BaseException], ...],
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.retry_on = retry_on
+        self.give_up_on = give_up_on
+        self.failures = 0
+        self.opened_at = 0.0
+        self.status: Literal["closed", "open", "half_open"] = "closed"
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Raise ``CircuitOpenError`` or admit the call; True marks the trial call."""
+        status = self.status
+        if status == "closed":
+            return False
+        with self._lock:
+            # Re-read under the lock: another caller may have moved it on.
+            status = self.status
+            if status == "closed":
+                return False
+            if status == "half_open":
+                raise CircuitOpenError(
+                    f"Circuit half-open for {self.name}; waiting on the trial call"
+                )
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"Circuit open for {self.name}; "
+                    f"next trial call allowed in {remaining:.1f} seconds"
+                )
+            self.status = "half_open"
+            return True
+
+    def record_success(self) -> None:
+        if self.status == "closed" and not self.failures:
+            return
+        with self._lock:
+            self.failures = 0
+            self.status = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            # A failed trial call in half_open is already past the threshold.
+            if self.failures >= self.threshold:
+                if self.status != "open":
+                    logger.warning(
+                        "Circuit opened for %s after %d consecutive failures",
+                        self.name,
+                        self.failures,
+                    )
+                self.status = "open"
+                self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        with self._lock:
+            if self.status == "half_open":
+                self.status = "open"
+
+    def settle(self, exc: BaseException | None, trial: bool) -> None:
+        """Record how an admitted call ended; ``exc`` is None on success."""
+        if exc is None:
+            self.record_success()
+        elif (
+            isinstance(exc, self.retry_on)
+            and not isinstance(exc, (asyncio.CancelledError, RetryAbortedError))
+            and not (self.give_up_on and isinstance(exc, self.give_up_on))
+        ):
+            self.record_failure()
+        elif trial:
+            # Errors that are never retried, cancellation and a stop_event
+            # abort tell nothing about the dependency; hand the trial slot back.
+            self.release_trial()
+
+    async def guard(self, awaitable: Awaitable[R], trial: bool) -> R:
+        try:
+            result = await awaitable
+        except BaseException as e:
+            self.settle(e, trial)
+            raise
+        self.settle(None, trial)
+        return result
+
+
+_JITTER_STRATEGIES = ("none", "full", "equal", "decorrelated")
 
 
 def retry(
     max_attempts: int = 3,
     delay: float = 1.0,
+    backoff_base: float | None = None,
+    backoff_cap: float = 30.0,
+    jitter: Literal["none", "full", "equal", "decorrelated"] = "full",
+    coalesce: bool = False,
+    coalesce_key: Callable[..., Hashable] | None = None,
+    retry_on: tuple[type[BaseException], ...] = (Exception,),
+    give_up_on: tuple[type[BaseException], ...] = (),
+    circuit_threshold: int | None = None,
+    circuit_reset_timeout: float = 30.0,
+    stop_event: threading.Event | asyncio.Event | None = None,
+    max_elapsed: float | None = None,
+    log_every_n: int = 1,
+    log_sample_rate: float = 1.0,
 ) -> Callable[[Callable[P, R]], Callable[P, R]]:
     """
     Decorator that retries a function on failure.
 
+    The wait before retry ``n`` grows exponentially as
+    ``min(backoff_cap, backoff_base * 2 ** (n - 1))`` and is then randomized
+    according to ``jitter`` so that concurrent callers do not retry in lockstep.
+
+    Coroutine functions are retried with ``asyncio.sleep``. A plain callable
+    that turns out to return an awaitable (for example a coroutine function
+    hidden behind another decorator) is switched to the async retry loop on
+    the fly, so the event loop is never blocked by ``time.sleep``.
+
+    While an attempt runs, ``current_attempt()`` (backed by the
+    ``retry_attempt_var`` context variable) returns its 1-based number, so
+    logging and tracing code can tag retries without extra plumbing.
+
     Args:
         max_attempts: Maximum number of attempts before giving up (default: 3)
-        delay: Seconds to wait between retries (default: 1.0)
+        delay: Seconds to wait before the first retry (default: 1.0)
+        backoff_base: Base of the exponential backoff (default: ``delay``)
+        backoff_cap: Upper bound in seconds for any single wait (default: 30.0)
+        jitter: Randomization strategy applied to the backoff (default: "full")
+            - "none": sleep the exponential backoff exactly
+            - "full": sleep uniformly in ``[0, backoff]``
+            - "equal": sleep ``backoff / 2`` plus uniform ``[0, backoff / 2]``
+            - "decorrelated": sleep uniformly in ``[base, previous * 3]``,
+              capped at ``backoff_cap``
+        coalesce: Share one in-flight call, retries included, between
+            concurrent callers with the same arguments instead of letting each
+            hammer the dependency on its own. Coroutine functions only: a
+            sync function raises ``TypeError`` at decoration, and a coroutine
+            hidden behind a plain callable is not coalesced (default: False)
+        coalesce_key: Builds the coalescing key from the call arguments
+            (default: ``args`` plus the keyword arguments sorted by name).
+            Calls whose key cannot be hashed are never coalesced.
+        retry_on: Exception types that trigger a retry; anything else
+            propagates immediately (default: ``(Exception,)``)
+        give_up_on: Exception types that propagate immediately even if they
+            match ``retry_on``, e.g. errors known to be permanent (default: ())
+        circuit_threshold: Open a circuit breaker after this many consecutive
+            calls exhausted their retries on a ``retry_on`` error. While open,
+            calls raise ``CircuitOpenError`` at once without running the
+            function or sleeping (default: None, no breaker)
+        circuit_reset_timeout: Seconds the breaker stays open before calls are
+            let through again; one more failure reopens it (default: 30.0)
+        stop_event: Event that interrupts the wait between retries as soon as
+            it is set, raising ``RetryAbortedError`` instead of retrying, e.g. for
+            graceful shutdown. Sync functions need a ``threading.Event``
+            (an ``asyncio.Event`` raises ``TypeError`` at decoration); async
+            functions accept either kind (default: None)
+        max_elapsed: Wall-clock budget in seconds for one call, retries
+            included. Once spent, the last failure is re-raised instead of
+            retrying, and no wait is allowed to overrun it (default: None)
+        log_every_n: Emit only every n-th retry warning of the decorated
+            function, counted across all of its calls (default: 1)
+        log_sample_rate: Probability of emitting a retry warning that passed
+            ``log_every_n`` (default: 1.0). Final failures are always logged.
 
     Returns:
         Decorated function that will retry on exception
 
     Raises:
-        The last exception encountered if all attempts fail
+        The exception from the final attempt if all attempts fail, re-raised
+        as-is with its original traceback
 
     Example:
         @retry(max_attempts=3, delay=0.5)
@@ -41,83 +310,348 @@ def retry(
             response.raise_for_status()
             return response.json()
 
-        @retry(max_attempts=5, delay=2.0)
+        @retry(max_attempts=5, delay=2.0, backoff_cap=10.0, jitter="equal")
         async def async_flaky_call():
             async with aiohttp.ClientSession() as session:
                 async with session.get("https://api.example.com") as resp:
                     return await resp.json()
     """
 
+    if jitter not in _JITTER_STRATEGIES:
+        raise ValueError(f"jitter must be one of {_JITTER_STRATEGIES}, got {jitter!r}")
+    if log_every_n < 1:
+        raise ValueError(f"log_every_n must be at least 1, got {log_every_n}")
+    if not 0.0 <= log_sample_rate <= 1.0:
+        raise ValueError(f"log_sample_rate must be between 0 and 1, got {log_sample_rate}")
+    if circuit_threshold is not None and circuit_threshold < 1:
+        raise ValueError(f"circuit_threshold must be at least 1, got {circuit_threshold}")
+
+    base = delay if backoff_base is None else backoff_base
+
     def decorator(func: Callable[P, R]) -> Callable[P, R]:
-        if asyncio.iscoroutinefunction(func):
-            @functools.wraps(func)
-            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-                last_exception: BaseException | None = None
+        # A private generator per decorated function keeps callers from
+        # contending on (or perturbing) the module-level random state.
+        rng = random.Random()
 
-                for attempt in range(1, max_attempts + 1):
-                    try:
-                        return await func(*args, **kwargs)
-                    except Exception as e:
-                        last_exception = e
-                        if attempt < max_attempts:
-                            logger.warning(
-                                "Attempt %d/%d failed for %s: %s. "
-                                "Retrying in %.1f seconds...",
-                                attempt,
-                                max_attempts,
-                                func.__name__,
-                                str(e),
-                                delay,
-                            )
-                            await asyncio.sleep(delay)
-                        else:
-                            logger.warning(
-                                "Attempt %d/%d failed for %s: %s. "
-                                "No more retries.",
-                                attempt,
-                                max_attempts,
-                                func.__name__,
-                                str(e),
-                            )
-
-                assert last_exception is not None
-                raise last_exception
-
-            return async_wrapper  # type: ignore[return-value]
-        else:
-            @functools.wraps(func)
-            def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-                last_exception: BaseException | None = None
-
-                for attempt in range(1, max_attempts + 1):
+        def _compute_delay(attempt: int, previous: float) -> float:
+            if jitter == "decorrelated":
+                return min(backoff_cap, rng.uniform(base, max(base, previous) * 3))
+            backoff = min(backoff_cap, base * 2.0 ** (attempt - 1))
+            if jitter == "full":
+                return rng.uniform(0, backoff)
+            if jitter == "equal":
+                return backoff / 2 + rng.uniform(0, backoff / 2)
+            return backoff
+
+        # max_attempts and the function name are fixed per decoration, so
+        # they are baked into the log messages once instead of being passed
+        # on every failed attempt.
+        display_name: str = getattr(func, "__name__", repr(func))
+        name = display_name.replace("%", "%%")
+        retry_msg = f"Attempt %d/{max_attempts} failed for {name}: %s. Retrying in %.1f seconds..."
+        # Logged without arguments, so the name must not be %-escaped here.
+        final_msg = (
+            f"Attempt {max_attempts}/{max_attempts} failed for {display_name}. No more retries."
+        )
+        abort_msg = f"Retries for {name} aborted by stop_event after attempt %d/{max_attempts}"
+        budget_msg = (
+            f"Attempt %d/{max_attempts} failed for {name}. "
+            f"Retry budget of {max_elapsed}s exhausted, no more retries."
+        )
+
+        # Bound once so a failed attempt does no attribute lookups on the
+        # logger or the time/asyncio modules. Retry warnings hand the
+        # exception to logging as-is, so it is only str()-ed if a handler
+        # actually emits the record; the final failure goes through
+        # logger.exception, which attaches the traceback instead.
+        _warn = logger.warning
+        _error = logger.exception
+        _enabled_for = logger.isEnabledFor
+        _sleep = time.sleep
+        _async_sleep = asyncio.sleep
+        _monotonic = time.monotonic
+        _set_attempt = retry_attempt_var.set
+        _reset_attempt = retry_attempt_var.reset
+
+        # Retry warnings can be thinned out for failure storms. The counter is
+        # shared by every call; next() on itertools.count is atomic under the
+        # GIL, so threads and coroutines can share it without a lock.
+        _sampled = log_every_n > 1 or log_sample_rate < 1.0
+        _log_counter = itertools.count()
+
+        def _sample() -> bool:
+            if log_every_n > 1 and next(_log_counter) % log_every_n:
+                return False
+            return log_sample_rate >= 1.0 or rng.random() < log_sample_rate
+
+        # Without a positive backoff base every wait is zero, so neither the
+        # backoff computation nor the sleep call (a syscall, or an extra
+        # event-loop round trip) is worth making.
+        _backoff = base > 0
+
+        # Every attempt but the last is retried unconditionally, so the loop
+        # covers attempts 1..max_attempts-1 and the final attempt is peeled
+        # off after it. Neither needs an "is this the last attempt?" check.
+        # range objects are immutable and hand out a fresh iterator per loop,
+        # so one instance is shared by every call instead of built per call.
+        _retry_attempts = range(1, max_attempts)
+
+        # The sync and async drivers below differ only in how they call and
+        # sleep; everything decided between two attempts lives here.
+        def _next_wait(
+            attempt: int, exc: BaseException, previous: float, deadline: float
+        ) -> float | None:
+            """Return the wait before retrying after ``exc``, or None to give up.
+
+            Must be called from the ``except`` block handling ``exc`` so that
+            the driver can re-raise it with a bare ``raise``.
+            """
+            if give_up_on and isinstance(exc, give_up_on):
+                return None
+            wait = _compute_delay(attempt, previous) if _backoff else 0.0
+            if max_elapsed is not None:
+                remaining = deadline - _monotonic()
+                if remaining <= 0:
+                    if _enabled_for(logging.ERROR):
+                        _error(budget_msg, attempt)
+                    return None
+                wait = min(wait, remaining)
+            if _enabled_for(logging.WARNING) and (not _sampled or _sample()):
+                _warn(retry_msg, attempt, exc, wait)
+            return wait
+
+        def _log_final(exc: BaseException) -> None:
+            # A give_up_on error is not a retry that ran out, whichever
+            # attempt raised it, so it propagates unlogged like on 1..n-1.
+            if give_up_on and isinstance(exc, give_up_on):
+                return
+            if _enabled_for(logging.ERROR):
+                _error(final_msg)
+
+        async def _retry_async(
+            args: tuple[Any, ...],
+            kwargs: dict[str, Any],
+            pending: Awaitable[R] | None = None,
+        ) -> R:
+            wait = base
+            # The clock is only read when a budget was asked for.
+            deadline = _monotonic() + max_elapsed if max_elapsed is not None else 0.0
+
+            for attempt in _retry_attempts:
+                token = _set_attempt(attempt)
+                try:
+                    if pending is None:
+                        return await func(*args, **kwargs)  # type: ignore[misc, no-any-return]
+                    awaitable, pending = pending, None
+                    return await awaitable
+                except asyncio.CancelledError:
+                    # Never swallow cancellation, whatever retry_on says.
+                    raise
+                except retry_on as e:
+                    next_wait = _next_wait(attempt, e, wait, deadline)
+                    if next_wait is None:
+                        raise
+                    wait = next_wait
+                    if stop_event is None:
+                        if wait > 0:
+                            await _async_sleep(wait)
+                    elif await _async_wait_or_stop(stop_event, wait):
+                        raise RetryAbortedError(abort_msg % attempt) from e
+                finally:
+                    _reset_attempt(token)
+
+            token = _set_attempt(max_attempts)
+            try:
+                if pending is None:
+                    return await func(*args, **kwargs)  # type: ignore[misc, no-any-return]
+                return await pending
+            except asyncio.CancelledError:
+                raise
+            except retry_on as e:
+                _log_final(e)
+                raise
+            finally:
+                _reset_attempt(token)
+
+        # Decided once per decoration; inspect is not consulted per attempt.
+        _is_async = inspect.iscoroutinefunction(func)
+
+        breaker = (
+            None
+            if circuit_threshold is None
+            else _CircuitBreaker(
+                display_name, circuit_threshold, circuit_reset_timeout, retry_on, give_up_on
+            )
+        )
+
+        def _with_breaker(wrapper: Callable[..., Any]) -> Callable[P, R]:
+            """Put the circuit breaker, if any, in front of a finished wrapper."""
+            if breaker is None:
+                return wrapper
+            guarded_breaker = breaker
+
+            if inspect.iscoroutinefunction(wrapper):
+                @_wraps(func)
+                async def async_guarded(*args: P.args, **kwargs: P.kwargs) -> R:
+                    trial = guarded_breaker.before_call()
+                    return await guarded_breaker.guard(wrapper(*args, **kwargs), trial)
+
+                return async_guarded  # type: ignore[return-value]
+
+            @_wraps(func)
+            def sync_guarded(*args: P.args, **kwargs: P.kwargs) -> R:
+                trial = guarded_breaker.before_call()
+                try:
+                    result = wrapper(*args, **kwargs)
+                except BaseException as e:
+                    guarded_breaker.settle(e, trial)
+                    raise
+                if inspect.isawaitable(result):
+                    return guarded_breaker.guard(result, trial)  # type: ignore[return-value]
+                guarded_breaker.settle(None, trial)
+                return result  # type: ignore[no-any-return]
+
+            return sync_guarded
+
+        if isinstance(stop_event, asyncio.Event) and not _is_async:
+            raise TypeError(
+                f"stop_event for sync function {display_name!r} must be a "
+                "threading.Event; an asyncio.Event cannot interrupt a blocking wait"
+            )
+        sync_stop = stop_event if isinstance(stop_event, threading.Event) else None
+
+        if coalesce and not _is_async:
+            raise TypeError(f"coalesce requires a coroutine function; {display_name!r} is not one")
+
+        if coalesce:
+            inflight: dict[Hashable, asyncio.Task[R]] = {}
+
+            def _coalesce_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable:
+                if coalesce_key is not None:
+                    return coalesce_key(*args, **kwargs)
+                # Built without hashing anything, so that only the lookup
+                # below can fail on unhashable arguments.
+                return (args, tuple(sorted(kwargs.items())))
+
+            async def _shared_call(args: tuple[Any, ...], kwargs: dict[str, Any]) -> R:
+                # The breaker sees one outcome per shared call, not one per
+                # waiter, and an open circuit fails every waiter at once.
+                if breaker is None:
+                    return await _retry_async(args, kwargs)
+                trial = breaker.before_call()
+                return await breaker.guard(_retry_async(args, kwargs), trial)
+
+            @_wraps(func)
+            async def coalesced_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                # Errors from a caller-supplied coalesce_key propagate.
+                key = _coalesce_key(args, kwargs)
+                try:
+                    task = inflight.get(key)
+                except TypeError:
+                    # Unhashable arguments cannot be matched to other calls.
+                    return await _shared_call(args, kwargs)
+
+                if task is None:
+                    task = asyncio.ensure_future(_shared_call(args, kwargs))
+                    inflight[key] = task
+
+                    def _forget(done: asyncio.Task[R]) -> None:
+                        if inflight.get(key) is done:
+                            del inflight[key]
+                        # Mark the outcome as retrieved even if every waiter
+                        # was cancelled before it arrived.
+                        if not done.cancelled():
+                            done.exception()
+
+                    task.add_done_callback(_forget)
+
+                # Shielded so one waiter being cancelled does not cancel the
+                # call the others are waiting on.
+                return await asyncio.shield(task)
+
+            return coalesced_wrapper  # type: ignore[return-value]
+
+        if max_attempts <= 1:
+            # Nothing to retry: skip the attempt loop and only keep the
+            # failure log.
+            if _is_async:
+                @_wraps(func)
+                async def async_single(*args: P.args, **kwargs: P.kwargs) -> R:
+                    token = _set_attempt(1)
                     try:
-                        return func(*args, **kwargs)
-                    except Exception as e:
-                        last_exception = e
-                        if attempt < max_attempts:
-                            logger.warning(
-                                "Attempt %d/%d failed for %s: %s. "
-                                "Retrying in %.1f seconds...",
-                                attempt,
-                                max_attempts,
-                                func.__name__,
-                                str(e),
-                                delay,
-                            )
-                            time.sleep(delay)
-                        else:
-                            logger.warning(
-                                "Attempt %d/%d failed for %s: %s. "
-                                "No more retries.",
-                                attempt,
-                                max_attempts,
-                                func.__name__,
-                                str(e),
-                            )
-
-                assert last_exception is not None
-                raise last_exception
-
-            return sync_wrapper  # type: ignore[return-value]
+                        return await func(*args, **kwargs)  # type: ignore[misc, no-any-return]
+                    except asyncio.CancelledError:
+                        raise
+                    except retry_on as e:
+                        _log_final(e)
+                        raise
+                    finally:
+                        _reset_attempt(token)
+
+                return _with_breaker(async_single)
+
+            @_wraps(func)
+            def sync_single(*args: P.args, **kwargs: P.kwargs) -> R:
+                token = _set_attempt(1)
+                try:
+                    result = func(*args, **kwargs)
+                except retry_on as e:
+                    _log_final(e)
+                    raise
+                finally:
+                    _reset_attempt(token)
+                if inspect.isawaitable(result):
+                    return _retry_async(args, kwargs, result)  # type: ignore[return-value]
+                return result
+
+            return _with_breaker(sync_single)
+
+        if _is_async:
+            @_wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                return await _retry_async(args, kwargs)
+
+            return _with_breaker(async_wrapper)
+
+        @_wraps(func)
+        def sync_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            wait = base
+            deadline = _monotonic() + max_elapsed if max_elapsed is not None else 0.0
+
+            for attempt in _retry_attempts:
+                token = _set_attempt(attempt)
+                try:
+                    result = func(*args, **kwargs)
+                except retry_on as e:
+                    next_wait = _next_wait(attempt, e, wait, deadline)
+                    if next_wait is None:
+                        raise
+                    wait = next_wait
+                    if sync_stop is None:
+                        if wait > 0:
+                            _sleep(wait)
+                    elif sync_stop.wait(wait):
+                        raise RetryAbortedError(abort_msg % attempt) from e
+                else:
+                    # A callable whose coroutine nature is hidden behind
+                    # another decorator still returns an awaitable. Retrying
+                    # it here would time.sleep() inside the event loop, so
+                    # hand it to the async retry loop instead.
+                    if inspect.isawaitable(result):
+                        return _retry_async(args, kwargs, result)  # type: ignore[return-value]
+                    return result
+                finally:
+                    _reset_attempt(token)
+
+            token = _set_attempt(max_attempts)
+            try:
+                return func(*args, **kwargs)
+            except retry_on as e:
+                _log_final(e)
+                raise
+            finally:
+                _reset_attempt(token)
+
+        return _with_breaker(sync_wrapper)
 
     return decorator
@@ -1,12 +1,16 @@
 """Tests for the retry decorator."""
 
 import asyncio
+import functools
+import inspect
 import logging
+import threading
 import time
+from collections.abc import Awaitable
 
 import pytest
 
-from src.utils.retry import retry
+from src.utils.retry import CircuitOpenError, RetryAbortedError, current_attempt, retry
 
 
 class TestSyncRetrySuccessFirstTry:
@@ -112,6 +116,183 @@ class TestAsyncRetryFailsThenSucceeds:
         assert call_count == 3
 
 
+class TestHiddenAsyncRetry:
+    """Test callables that return awaitables without being coroutine functions."""
+
+    @pytest.mark.asyncio
+    async def test_hidden_coroutine_retries_without_blocking(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        call_count = 0
+
+        def blocking_sleep(seconds: float) -> None:
+            raise AssertionError("time.sleep called inside the event loop")
+
+        monkeypatch.setattr(time, "sleep", blocking_sleep)
+
+        async def fails_twice() -> str:
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise ValueError(f"Attempt {call_count} failed")
+            return "async success"
+
+        def hide_coroutine(*args: object, **kwargs: object) -> Awaitable[str]:
+            return fails_twice()
+
+        wrapped = retry(max_attempts=3, delay=0.01)(hide_coroutine)
+
+        assert await wrapped() == "async success"
+        assert call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_hidden_coroutine_exhaustion_raises(self) -> None:
+        async def always_fails() -> str:
+            raise ValueError("Hidden failure")
+
+        wrapped = retry(max_attempts=2, delay=0.01)(lambda: always_fails())
+
+        with pytest.raises(ValueError, match="Hidden failure"):
+            await wrapped()
+
+
+class TestAsyncCoalescing:
+    """Test sharing one in-flight retrying call between concurrent callers."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0.01, coalesce=True)
+        async def flaky(key: str) -> str:
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise ConnectionError("Down")
+            return f"value-{key}"
+
+        results = await asyncio.gather(*(flaky("a") for _ in range(5)))
+
+        assert results == ["value-a"] * 5
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_arguments_are_not_coalesced(self) -> None:
+        calls: list[str] = []
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def fetch(key: str) -> str:
+            calls.append(key)
+            await asyncio.sleep(0)
+            return key
+
+        assert list(await asyncio.gather(fetch("a"), fetch("b"), fetch("a"))) == ["a", "b", "a"]
+        assert sorted(calls) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_delivered_to_every_waiter(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def always_fails() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise ConnectionError("Still down")
+
+        results = await asyncio.gather(*(always_fails() for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_completed_call_is_not_reused(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def counted() -> int:
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        assert await counted() == 1
+        assert await counted() == 2
+
+    @pytest.mark.asyncio
+    async def test_custom_key_and_unhashable_arguments(self) -> None:
+        calls: list[object] = []
+
+        @retry(max_attempts=2, delay=0, coalesce=True, coalesce_key=lambda payload: payload["id"])
+        async def by_id(payload: dict[str, int]) -> int:
+            calls.append(payload)
+            await asyncio.sleep(0)
+            return payload["id"]
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def unhashable(payload: list[int]) -> int:
+            calls.append(payload)
+            await asyncio.sleep(0)
+            return len(payload)
+
+        assert list(await asyncio.gather(by_id({"id": 1}), by_id({"id": 1}))) == [1, 1]
+        assert len(calls) == 1
+        assert list(await asyncio.gather(unhashable([1]), unhashable([1]))) == [1, 1]
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_keyword_order_does_not_matter(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def fetch(a: int, b: int) -> int:
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0)
+            return a + b
+
+        assert list(await asyncio.gather(fetch(a=1, b=2), fetch(b=2, a=1))) == [3, 3]
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_broken_key_function_raises(self) -> None:
+        @retry(max_attempts=2, delay=0, coalesce=True, coalesce_key=lambda: "no-args")
+        async def fetch(key: str) -> str:
+            return key
+
+        with pytest.raises(TypeError):
+            await fetch("a")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self) -> None:
+        call_count = 0
+        release = asyncio.Event()
+
+        @retry(max_attempts=2, delay=0, coalesce=True)
+        async def slow() -> str:
+            nonlocal call_count
+            call_count += 1
+            await release.wait()
+            return "shared"
+
+        first = asyncio.ensure_future(slow())
+        second = asyncio.ensure_future(slow())
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        release.set()
+        assert await second == "shared"
+        assert call_count == 1
+
+    def test_sync_function_rejects_coalesce(self) -> None:
+        def fetch() -> str:
+            return "sync"
+
+        with pytest.raises(TypeError, match="coalesce"):
+            retry(coalesce=True)(fetch)
+
+
 class TestRetryExhaustion:
     """Test behavior when all retries are exhausted."""
 
@@ -144,6 +325,31 @@ class TestRetryExhaustion:
 
         assert call_count == 3
 
+    def test_final_exception_propagates_unchained(self) -> None:
+        @retry(max_attempts=3, delay=0)
+        def always_fails() -> str:
+            raise ValueError("Final failure")
+
+        with pytest.raises(ValueError) as exc_info:
+            always_fails()
+
+        # Earlier attempts must not leak into the chain, and the traceback
+        # must end in the function that raised rather than a re-raise site.
+        assert exc_info.value.__context__ is None
+        assert exc_info.traceback[-1].name == "always_fails"
+
+    @pytest.mark.asyncio
+    async def test_async_final_exception_propagates_unchained(self) -> None:
+        @retry(max_attempts=3, delay=0)
+        async def async_always_fails() -> str:
+            raise ValueError("Async final failure")
+
+        with pytest.raises(ValueError) as exc_info:
+            await async_always_fails()
+
+        assert exc_info.value.__context__ is None
+        assert exc_info.traceback[-1].name == "async_always_fails"
+
     def test_single_attempt_raises_immediately(self) -> None:
         call_count = 0
 
@@ -158,6 +364,561 @@ class TestRetryExhaustion:
 
         assert call_count == 1
 
+    @pytest.mark.asyncio
+    async def test_async_single_attempt_raises_immediately(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=1)
+        async def single_attempt() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise RuntimeError("Async single failure")
+
+        with pytest.raises(RuntimeError, match="Async single failure"):
+            await single_attempt()
+
+        assert call_count == 1
+
+    def test_single_attempt_logs_failure(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=1)
+        def single_attempt() -> str:
+            raise RuntimeError("Logged single failure")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(RuntimeError):
+                single_attempt()
+
+        assert [r.message for r in caplog.records] == [
+            "Attempt 1/1 failed for single_attempt. No more retries."
+        ]
+        assert caplog.records[0].exc_info is not None
+
+
+class TestRetryExceptionFilter:
+    """Test restricting which exceptions are retried."""
+
+    def test_non_matching_exception_is_not_retried(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0, retry_on=(ConnectionError,))
+        def bug() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise KeyError("missing")
+
+        with pytest.raises(KeyError):
+            bug()
+
+        assert call_count == 1
+
+    def test_matching_exception_is_retried(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0, retry_on=(ConnectionError,))
+        def transient() -> str:
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise ConnectionError("Flaky")
+            return "connected"
+
+        assert transient() == "connected"
+        assert call_count == 3
+
+    def test_give_up_on_overrides_retry_on(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0, give_up_on=(PermissionError,))
+        def forbidden() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise PermissionError("Denied")
+
+        with pytest.raises(PermissionError):
+            forbidden()
+
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_async_give_up_on(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0, retry_on=(OSError,), give_up_on=(FileNotFoundError,))
+        async def missing() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise FileNotFoundError("Gone")
+
+        with pytest.raises(FileNotFoundError):
+            await missing()
+
+        assert call_count == 1
+
+    def test_give_up_error_is_not_logged_on_any_attempt(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        outcomes: list[Exception] = [ConnectionError("Flaky"), PermissionError("Denied")]
+
+        @retry(max_attempts=2, delay=0, give_up_on=(PermissionError,))
+        def last_attempt_gives_up() -> str:
+            raise outcomes.pop(0)
+
+        @retry(max_attempts=1, give_up_on=(PermissionError,))
+        def only_attempt_gives_up() -> str:
+            raise PermissionError("Denied")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(PermissionError):
+                last_attempt_gives_up()
+            with pytest.raises(PermissionError):
+                only_attempt_gives_up()
+
+        assert [r.levelno for r in caplog.records] == [logging.WARNING]
+        assert "Retrying" in caplog.records[0].message
+
+    @pytest.mark.asyncio
+    async def test_cancellation_is_never_retried(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0, retry_on=(BaseException,))
+        async def cancelled() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise asyncio.CancelledError()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled()
+
+        assert call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelling_final_attempt_is_not_logged(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        started = asyncio.Event()
+
+        async def hang() -> str:
+            started.set()
+            await asyncio.Event().wait()
+            return "never"
+
+        for attempts in (1, 2):
+            attempt_calls = 0
+
+            async def hang_on_last() -> str:
+                nonlocal attempt_calls
+                attempt_calls += 1
+                if attempt_calls < attempts:
+                    raise ValueError("Retry me")
+                return await hang()
+
+            wrapped = retry(max_attempts=attempts, delay=0, retry_on=(BaseException,))(hang_on_last)
+            started.clear()
+            with caplog.at_level(logging.ERROR):
+                task = asyncio.ensure_future(wrapped())
+                await started.wait()
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        assert caplog.records == []
+
+
+class TestCircuitBreaker:
+    """Test short-circuiting calls while a dependency is known to be down."""
+
+    def test_opens_after_threshold_and_skips_calls(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=2, delay=0, circuit_threshold=2, circuit_reset_timeout=60)
+        def down() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise ConnectionError("Down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                down()
+        assert call_count == 4
+
+        with pytest.raises(CircuitOpenError):
+            down()
+        assert call_count == 4
+
+    def test_half_open_trial_closes_on_success(self) -> None:
+        healthy = False
+
+        @retry(max_attempts=1, circuit_threshold=1, circuit_reset_timeout=0.05)
+        def recovering() -> str:
+            if not healthy:
+                raise ConnectionError("Down")
+            return "up"
+
+        with pytest.raises(ConnectionError):
+            recovering()
+        with pytest.raises(CircuitOpenError):
+            recovering()
+
+        time.sleep(0.06)
+        healthy = True
+        assert recovering() == "up"
+        assert recovering() == "up"
+
+    def test_half_open_trial_failure_reopens(self) -> None:
+        @retry(max_attempts=1, circuit_threshold=2, circuit_reset_timeout=0.05)
+        def down() -> str:
+            raise ConnectionError("Down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                down()
+
+        time.sleep(0.06)
+        with pytest.raises(ConnectionError):
+            down()
+        with pytest.raises(CircuitOpenError):
+            down()
+
+    @pytest.mark.asyncio
+    async def test_half_open_admits_a_single_trial_call(self) -> None:
+        healthy = False
+        call_count = 0
+
+        @retry(max_attempts=1, circuit_threshold=1, circuit_reset_timeout=0.05)
+        async def recovering() -> str:
+            nonlocal call_count
+            call_count += 1
+            if not healthy:
+                raise ConnectionError("Down")
+            await asyncio.sleep(0.01)
+            return "up"
+
+        with pytest.raises(ConnectionError):
+            await recovering()
+
+        await asyncio.sleep(0.06)
+        healthy = True
+        call_count = 0
+        results = await asyncio.gather(*(recovering() for _ in range(50)), return_exceptions=True)
+
+        assert call_count == 1
+        assert results.count("up") == 1
+        assert sum(isinstance(r, CircuitOpenError) for r in results) == 49
+        assert await recovering() == "up"
+
+    def test_give_up_error_on_trial_releases_the_slot(self) -> None:
+        outcomes: list[BaseException | None] = [
+            ConnectionError("Down"),
+            PermissionError("Denied"),
+            None,
+        ]
+
+        @retry(
+            max_attempts=1,
+            give_up_on=(PermissionError,),
+            circuit_threshold=1,
+            circuit_reset_timeout=0.05,
+        )
+        def scripted() -> str:
+            outcome = outcomes.pop(0)
+            if outcome is not None:
+                raise outcome
+            return "up"
+
+        with pytest.raises(ConnectionError):
+            scripted()
+
+        time.sleep(0.06)
+        with pytest.raises(PermissionError):
+            scripted()
+        # The trial told nothing about the dependency, so the next call is
+        # the new trial instead of the breaker staying half-open for good.
+        assert scripted() == "up"
+        assert outcomes == []
+
+    def test_stop_event_abort_does_not_trip(self) -> None:
+        stop = threading.Event()
+        healthy = False
+
+        @retry(
+            max_attempts=3,
+            delay=0.01,
+            stop_event=stop,
+            circuit_threshold=1,
+            circuit_reset_timeout=0.05,
+        )
+        def shutting_down() -> str:
+            if not healthy:
+                raise ConnectionError("Down")
+            return "up"
+
+        stop.set()
+        with pytest.raises(RetryAbortedError):
+            shutting_down()
+        # Still closed: the call runs instead of raising CircuitOpenError.
+        with pytest.raises(RetryAbortedError):
+            shutting_down()
+
+        stop.clear()
+        with pytest.raises(ConnectionError):
+            shutting_down()
+        time.sleep(0.06)
+        stop.set()
+        with pytest.raises(RetryAbortedError):
+            shutting_down()
+        # The aborted trial handed its slot back instead of reopening.
+        healthy = True
+        assert shutting_down() == "up"
+
+    def test_success_resets_consecutive_failures(self) -> None:
+        outcomes = iter([False, True, False, False])
+
+        @retry(max_attempts=1, circuit_threshold=2, circuit_reset_timeout=60)
+        def sometimes() -> str:
+            if not next(outcomes):
+                raise ConnectionError("Down")
+            return "up"
+
+        with pytest.raises(ConnectionError):
+            sometimes()
+        assert sometimes() == "up"
+        with pytest.raises(ConnectionError):
+            sometimes()
+        with pytest.raises(ConnectionError):
+            sometimes()
+        with pytest.raises(CircuitOpenError):
+            sometimes()
+
+    def test_give_up_errors_do_not_trip(self) -> None:
+        call_count = 0
+
+        @retry(
+            max_attempts=2,
+            delay=0,
+            give_up_on=(PermissionError,),
+            circuit_threshold=1,
+            circuit_reset_timeout=60,
+        )
+        def forbidden() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise PermissionError("Denied")
+
+        for _ in range(3):
+            with pytest.raises(PermissionError):
+                forbidden()
+        assert call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_coalesced_waiters_record_one_failure(self) -> None:
+        call_count = 0
+
+        @retry(
+            max_attempts=1,
+            coalesce=True,
+            circuit_threshold=2,
+            circuit_reset_timeout=60,
+        )
+        async def down() -> str:
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            raise ConnectionError("Down")
+
+        results = await asyncio.gather(*(down() for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert call_count == 1
+
+        # One shared failure is below the threshold, so the next call still
+        # reaches the dependency and only then opens the circuit.
+        with pytest.raises(ConnectionError):
+            await down()
+        assert call_count == 2
+        with pytest.raises(CircuitOpenError):
+            await down()
+
+    @pytest.mark.asyncio
+    async def test_async_breaker(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=2, delay=0, circuit_threshold=1, circuit_reset_timeout=60)
+        async def down() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise ConnectionError("Down")
+
+        with pytest.raises(ConnectionError):
+            await down()
+        with pytest.raises(CircuitOpenError):
+            await down()
+        assert call_count == 2
+        assert down.__name__ == "down"
+
+    def test_threshold_must_be_positive(self) -> None:
+        with pytest.raises(ValueError, match="circuit_threshold"):
+            retry(circuit_threshold=0)
+
+
+class TestStopEvent:
+    """Test interrupting the wait between retries."""
+
+    def test_set_event_aborts_sleep(self) -> None:
+        stop = threading.Event()
+        call_count = 0
+
+        @retry(max_attempts=3, delay=10.0, jitter="none", stop_event=stop)
+        def always_fails() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise ConnectionError("Down")
+
+        threading.Timer(0.05, stop.set).start()
+        started = time.monotonic()
+        with pytest.raises(RetryAbortedError) as exc_info:
+            always_fails()
+
+        assert time.monotonic() - started < 5
+        assert call_count == 1
+        assert isinstance(exc_info.value.__cause__, ConnectionError)
+
+    def test_sync_function_rejects_asyncio_event(self) -> None:
+        def sync_call() -> str:
+            return "never"
+
+        with pytest.raises(TypeError, match="threading.Event"):
+            retry(stop_event=asyncio.Event())(sync_call)
+
+    def test_unset_event_retries_normally(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=3, delay=0.01, stop_event=threading.Event())
+        def fails_twice() -> str:
+            nonlocal call_count
+            call_count += 1
+            if call_count < 3:
+                raise ConnectionError("Down")
+            return "done"
+
+        assert fails_twice() == "done"
+        assert call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_async_event_aborts_sleep(self) -> None:
+        stop = asyncio.Event()
+
+        @retry(max_attempts=3, delay=10.0, jitter="none", stop_event=stop)
+        async def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        asyncio.get_running_loop().call_later(0.05, stop.set)
+        started = time.monotonic()
+        with pytest.raises(RetryAbortedError):
+            await always_fails()
+
+        assert time.monotonic() - started < 5
+
+    @pytest.mark.asyncio
+    async def test_async_threading_event_aborts_sleep(self) -> None:
+        stop = threading.Event()
+
+        @retry(max_attempts=3, delay=10.0, jitter="none", stop_event=stop)
+        async def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        threading.Timer(0.05, stop.set).start()
+        started = time.monotonic()
+        with pytest.raises(RetryAbortedError):
+            await always_fails()
+
+        assert time.monotonic() - started < 5
+
+    @pytest.mark.asyncio
+    async def test_async_threading_event_waits_do_not_hold_threads(self) -> None:
+        @retry(max_attempts=2, delay=0.3, jitter="none", stop_event=threading.Event())
+        async def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(always_fails() for _ in range(64)), return_exceptions=True)
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert time.monotonic() - started < 2
+
+    @pytest.mark.asyncio
+    async def test_async_threading_event_wait_stops_on_cancel(self) -> None:
+        @retry(max_attempts=2, delay=10.0, jitter="none", stop_event=threading.Event())
+        async def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        task = asyncio.ensure_future(always_fails())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        started = time.monotonic()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert time.monotonic() - started < 1
+
+    @pytest.mark.asyncio
+    async def test_async_unset_event_sleeps_full_delay(self) -> None:
+        call_times: list[float] = []
+
+        @retry(max_attempts=2, delay=0.1, jitter="none", stop_event=asyncio.Event())
+        async def timed() -> str:
+            call_times.append(time.monotonic())
+            raise ConnectionError("Down")
+
+        with pytest.raises(ConnectionError):
+            await timed()
+
+        assert call_times[1] - call_times[0] >= 0.09
+
+
+class TestMaxElapsed:
+    """Test the wall-clock budget across retries."""
+
+    def test_stops_retrying_once_budget_is_spent(self) -> None:
+        call_count = 0
+
+        @retry(max_attempts=10, delay=0.05, jitter="none", max_elapsed=0.12)
+        def always_fails() -> str:
+            nonlocal call_count
+            call_count += 1
+            raise ConnectionError("Down")
+
+        started = time.monotonic()
+        with pytest.raises(ConnectionError):
+            always_fails()
+
+        assert time.monotonic() - started < 0.5
+        assert call_count < 10
+
+    def test_wait_is_clamped_to_remaining_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps: list[float] = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+
+        @retry(max_attempts=2, delay=60.0, jitter="none", max_elapsed=1.0)
+        def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        with pytest.raises(ConnectionError):
+            always_fails()
+
+        assert len(sleeps) == 1
+        assert 0 < sleeps[0] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_async_budget_logs_exhaustion(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=10, delay=0.05, jitter="none", max_elapsed=0.08)
+        async def always_fails() -> str:
+            raise ConnectionError("Down")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(ConnectionError):
+                await always_fails()
+
+        assert "Retry budget of 0.08s exhausted" in caplog.records[-1].message
+
 
 class TestRetryDelay:
     """Test that delay is respected between retries."""
@@ -166,7 +927,7 @@ class TestRetryDelay:
         call_count = 0
         call_times: list[float] = []
 
-        @retry(max_attempts=3, delay=0.1)
+        @retry(max_attempts=3, delay=0.1, jitter="none")
         def timed_fails() -> str:
             nonlocal call_count
             call_count += 1
@@ -186,7 +947,7 @@ class TestRetryDelay:
         call_count = 0
         call_times: list[float] = []
 
-        @retry(max_attempts=3, delay=0.1)
+        @retry(max_attempts=3, delay=0.1, jitter="none")
         async def async_timed_fails() -> str:
             nonlocal call_count
             call_count += 1
@@ -202,6 +963,132 @@ class TestRetryDelay:
         assert call_times[2] - call_times[1] >= 0.09
 
 
+class TestRetryBackoff:
+    """Test exponential backoff and jitter strategies."""
+
+    @staticmethod
+    def _record_sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+        sleeps: list[float] = []
+        monkeypatch.setattr(time, "sleep", sleeps.append)
+        return sleeps
+
+    def test_no_jitter_doubles_each_retry(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=4, delay=1.0, jitter="none")
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        assert sleeps == [1.0, 2.0, 4.0]
+
+    def test_backoff_is_capped(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=5, delay=1.0, backoff_cap=3.0, jitter="none")
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        assert sleeps == [1.0, 2.0, 3.0, 3.0]
+
+    def test_full_jitter_stays_within_backoff(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=6, delay=1.0, backoff_cap=8.0)
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        assert len(sleeps) == 5
+        for attempt, slept in enumerate(sleeps, start=1):
+            assert 0 <= slept <= min(8.0, 2 ** (attempt - 1))
+
+    def test_equal_jitter_keeps_half_the_backoff(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=4, delay=2.0, jitter="equal")
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        for attempt, slept in enumerate(sleeps, start=1):
+            backoff = 2.0 * 2 ** (attempt - 1)
+            assert backoff / 2 <= slept <= backoff
+
+    def test_decorrelated_jitter_bounds(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=6, delay=0.5, backoff_cap=5.0, jitter="decorrelated")
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        previous = 0.5
+        for slept in sleeps:
+            assert 0.5 <= slept <= min(5.0, previous * 3)
+            previous = slept
+
+    def test_zero_delay_never_sleeps(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+        call_count = 0
+
+        @retry(max_attempts=4, delay=0)
+        def fails_then_succeeds() -> str:
+            nonlocal call_count
+            call_count += 1
+            if call_count < 4:
+                raise ValueError("Not yet")
+            return "done"
+
+        assert fails_then_succeeds() == "done"
+        assert sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_async_zero_delay_never_sleeps(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps: list[float] = []
+
+        async def record_sleep(seconds: float) -> None:
+            sleeps.append(seconds)
+
+        monkeypatch.setattr(asyncio, "sleep", record_sleep)
+
+        @retry(max_attempts=3, delay=0)
+        async def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            await always_fails()
+
+        assert sleeps == []
+
+    def test_backoff_base_overrides_delay(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        sleeps = self._record_sleeps(monkeypatch)
+
+        @retry(max_attempts=3, delay=10.0, backoff_base=0.25, jitter="none")
+        def always_fails() -> str:
+            raise ValueError("Nope")
+
+        with pytest.raises(ValueError):
+            always_fails()
+
+        assert sleeps == [0.25, 0.5]
+
+    def test_unknown_jitter_is_rejected(self) -> None:
+        with pytest.raises(ValueError, match="jitter"):
+            retry(jitter="Full")  # type: ignore[arg-type]
+
+
 class TestRetryLogging:
     """Test that retry attempts are logged."""
 
@@ -232,6 +1119,162 @@ class TestRetryLogging:
 
         assert any("Specific error message" in r.message for r in caplog.records)
 
+    def test_log_messages_include_attempt_counts(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=2, delay=0.01, jitter="none")
+        def counted() -> str:
+            raise ValueError("Boom")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(ValueError):
+                counted()
+
+        assert [(r.levelno, r.message) for r in caplog.records] == [
+            (logging.WARNING, "Attempt 1/2 failed for counted: Boom. Retrying in 0.0 seconds..."),
+            (logging.ERROR, "Attempt 2/2 failed for counted. No more retries."),
+        ]
+
+    def test_final_failure_log_carries_traceback(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=2, delay=0)
+        def exhausted() -> str:
+            raise ValueError("Final details")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(ValueError):
+                exhausted()
+
+        final = caplog.records[-1]
+        assert final.exc_info is not None
+        assert isinstance(final.exc_info[1], ValueError)
+        assert "Final details" in caplog.text
+
+    def test_disabled_logging_skips_exception_formatting(self) -> None:
+        str_calls = 0
+
+        class CountingError(Exception):
+            def __str__(self) -> str:
+                nonlocal str_calls
+                str_calls += 1
+                return "counted"
+
+        @retry(max_attempts=3, delay=0)
+        def always_fails() -> str:
+            raise CountingError()
+
+        retry_logger = logging.getLogger("src.utils.retry")
+        previous_level = retry_logger.level
+        retry_logger.setLevel(logging.CRITICAL)
+        try:
+            with pytest.raises(CountingError):
+                always_fails()
+        finally:
+            retry_logger.setLevel(previous_level)
+
+        assert str_calls == 0
+
+    def test_error_level_formats_exception_only_for_final_log(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        str_calls = 0
+
+        class CountingError(Exception):
+            def __str__(self) -> str:
+                nonlocal str_calls
+                str_calls += 1
+                return "counted"
+
+        @retry(max_attempts=3, delay=0)
+        def always_fails() -> str:
+            raise CountingError()
+
+        with caplog.at_level(logging.ERROR, logger="src.utils.retry"):
+            with pytest.raises(CountingError):
+                always_fails()
+
+        assert [r.levelno for r in caplog.records] == [logging.ERROR]
+        assert str_calls == 1
+
+
+class TestRetryLogSampling:
+    """Test thinning out retry warnings during failure storms."""
+
+    def test_log_every_n_counts_across_calls(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=3, delay=0, log_every_n=3)
+        def always_fails() -> str:
+            raise ValueError("Storm")
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(3):
+                with pytest.raises(ValueError):
+                    always_fails()
+
+        retries = [r for r in caplog.records if "Retrying" in r.message]
+        finals = [r for r in caplog.records if "No more retries" in r.message]
+        assert len(retries) == 2
+        assert len(finals) == 3
+
+    def test_zero_sample_rate_keeps_final_failure(self, caplog: pytest.LogCaptureFixture) -> None:
+        @retry(max_attempts=4, delay=0, log_sample_rate=0.0)
+        def always_fails() -> str:
+            raise ValueError("Storm")
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(ValueError):
+                always_fails()
+
+        assert [r.message for r in caplog.records] == [
+            "Attempt 4/4 failed for always_fails. No more retries."
+        ]
+
+    def test_log_every_n_must_be_positive(self) -> None:
+        with pytest.raises(ValueError, match="log_every_n"):
+            retry(log_every_n=0)
+
+    def test_log_sample_rate_must_be_a_probability(self) -> None:
+        for rate in (-0.1, 1.5):
+            with pytest.raises(ValueError, match="log_sample_rate"):
+                retry(log_sample_rate=rate)
+
+
+class TestCurrentAttempt:
+    """Test exposing the running attempt number through a context variable."""
+
+    def test_sync_attempts_are_numbered(self) -> None:
+        seen: list[int] = []
+
+        @retry(max_attempts=3, delay=0)
+        def records() -> str:
+            seen.append(current_attempt())
+            if len(seen) < 3:
+                raise ValueError("Again")
+            return "done"
+
+        assert records() == "done"
+        assert seen == [1, 2, 3]
+        assert current_attempt() == 0
+
+    @pytest.mark.asyncio
+    async def test_async_attempts_are_scoped_per_task(self) -> None:
+        seen: dict[str, list[int]] = {"a": [], "b": []}
+
+        @retry(max_attempts=3, delay=0.01)
+        async def records(key: str, failures: int) -> str:
+            seen[key].append(current_attempt())
+            await asyncio.sleep(0)
+            if len(seen[key]) <= failures:
+                raise ValueError("Again")
+            return key
+
+        assert list(await asyncio.gather(records("a", 2), records("b", 0))) == ["a", "b"]
+        assert seen == {"a": [1, 2, 3], "b": [1]}
+        assert current_attempt() == 0
+
+    def test_single_attempt_reports_one(self) -> None:
+        @retry(max_attempts=1)
+        def once() -> int:
+            return current_attempt()
+
+        assert once() == 1
+
 
 class TestRetryDefaults:
     """Test default parameter values."""
@@ -253,7 +1296,7 @@ class TestRetryDefaults:
     def test_default_delay_is_one_second(self) -> None:
         call_times: list[float] = []
 
-        @retry(max_attempts=2)
+        @retry(max_attempts=2, jitter="none")
         def timed() -> str:
             call_times.append(time.time())
             raise ValueError("Timing")
@@ -282,3 +1325,47 @@ class TestFunctionMetadataPreservation:
             return "documented"
 
         assert documented_function.__doc__ == "This is my docstring."
+
+    def test_preserves_qualname_and_wrapped(self) -> None:
+        def original() -> str:
+            return "original"
+
+        decorated = retry()(original)
+
+        assert decorated.__qualname__ == original.__qualname__
+        assert decorated.__module__ == original.__module__
+        assert decorated.__wrapped__ is original  # type: ignore[attr-defined]
+
+    def test_accepts_callables_without_name(self) -> None:
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        class Doubler:
+            def __call__(self, value: int) -> int:
+                return value * 2
+
+        assert retry()(functools.partial(add, 1))(2) == 3
+        assert retry(max_attempts=1)(Doubler())(4) == 8
+
+    def test_nameless_callable_is_named_in_logs(self, caplog: pytest.LogCaptureFixture) -> None:
+        def fails(value: int) -> int:
+            raise ValueError(f"Bad {value}")
+
+        wrapped = retry(max_attempts=2, delay=0)(functools.partial(fails, 7))
+
+        with caplog.at_level(logging.WARNING):
+            with pytest.raises(ValueError):
+                wrapped()
+
+        assert "functools.partial" in caplog.records[0].message
+
+    @pytest.mark.asyncio
+    async def test_async_wrapper_stays_a_coroutine_function(self) -> None:
+        @retry()
+        async def async_documented() -> str:
+            """Async docstring."""
+            return "documented"
+
+        assert inspect.iscoroutinefunction(async_documented)
+        assert async_documented.__name__ == "async_documented"
+        assert async_documented.__doc__ == "Async docstring."